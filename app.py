@@ -1,14 +1,44 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Dict
 import uuid
-import pymysql
+import aiomysql
 from typing import Optional
 from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
+import asyncio
 import json
-import subprocess
+import os
+from optimizers.schemas import INPUT_SCHEMAS, schema_for, msgpack
+from archive import decompress_payload
+
+#db connection configuration (point DB_HOST/DB_PORT at a local MySQL/MariaDB to run against it)
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", ""),
+    "port": int(os.getenv("DB_PORT", "3306")),
+    "user": os.getenv("DB_USER", ""),
+    "password": os.getenv("DB_PASSWORD", ""),
+    "db": os.getenv("OPT_DB_NAME", "OptimizationProblemDatabase"),
+    "minsize": int(os.getenv("DB_POOL_MIN", "1")),
+    "maxsize": int(os.getenv("DB_POOL_MAX", "20")),
+    # every statement commits on its own, so pooled connections never hold a stale snapshot
+    "autocommit": True,
+}
+
+# When set, jobs are handed to a `python hub.py --serve` fork server on the same host instead of spawning hub.py
+HUB_SOCKET = os.getenv("HUB_SOCKET")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.db_pool = await aiomysql.create_pool(**DB_CONFIG)
+    try:
+        yield
+    finally:
+        app.state.db_pool.close()
+        await app.state.db_pool.wait_closed()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 @app.middleware("http")
 async def log_exceptions(request, call_next):
@@ -18,15 +48,12 @@ async def log_exceptions(request, call_next):
         print(f"Exception occurred: {e}")  #log the exception
         raise
 
-#db connection configuration
-def get_db_connection():
-    return pymysql.connect(
-        host="",
-        user="",
-        password="",
-        database="OptimizationProblemDatabase",
-        cursorclass=pymysql.cursors.DictCursor
-    )
+@asynccontextmanager
+async def get_db_cursor():
+    """Borrow a pooled connection and yield a dict cursor on it."""
+    async with app.state.db_pool.acquire() as connection:
+        async with connection.cursor(aiomysql.DictCursor) as cursor:
+            yield cursor
 
 class JobRequest(BaseModel):
     optimizer_id: Optional[int] = None
@@ -34,44 +61,35 @@ class JobRequest(BaseModel):
     data: Dict
 #validate api key
 async def validate_api_key(api_key: str):
-    connection = get_db_connection()
     print(f"Validating API key: {api_key}")  
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT 1 FROM ApiKeys 
-                WHERE api_key = %s AND user_id != 0 AND key_expiration_date >= CURDATE()
-                """,
-                (api_key,),
-            )
-            if cursor.fetchone() is None:
-                raise HTTPException(status_code=401, detail="Invalid or expired API Key")
-    finally:
-        connection.close()
+    async with get_db_cursor() as cursor:
+        await cursor.execute(
+            """
+            SELECT 1 FROM ApiKeys 
+            WHERE api_key = %s AND user_id != 0 AND key_expiration_date >= CURDATE()
+            """,
+            (api_key,),
+        )
+        if await cursor.fetchone() is None:
+            raise HTTPException(status_code=401, detail="Invalid or expired API Key")
 
 
 # Routes
 @app.post("/generate-key")
-def generate_key(user_id: int = 0):
+async def generate_key(user_id: int = 0):
     print(f"Generating key for user_id: {user_id}")
-    connection = get_db_connection()
     new_key = f"API-{uuid.uuid4().hex[:16].upper()}"  
     instantiating_date = datetime.now().date()  
     expiration_date = instantiating_date + timedelta(days=60)
 
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """
-                INSERT INTO ApiKeys (api_key, user_id, key_instantiating_date, key_expiration_date)
-                VALUES (%s, %s, %s, %s)
-                """,
-                (new_key, user_id, instantiating_date, expiration_date),
-            )
-            connection.commit()
-    finally:
-        connection.close()
+    async with get_db_cursor() as cursor:
+        await cursor.execute(
+            """
+            INSERT INTO ApiKeys (api_key, user_id, key_instantiating_date, key_expiration_date)
+            VALUES (%s, %s, %s, %s)
+            """,
+            (new_key, user_id, instantiating_date, expiration_date),
+        )
 
     print(f"Generated API key: {new_key}")
     return {
@@ -112,55 +130,94 @@ def generate_key(user_id: int = 0):
 
 
 
-@app.post("/submit-job")
-def submit_job(job_request: JobRequest, api_key: str = Depends(validate_api_key)):
-    print(f"Received job submission: {job_request}")  # Debug log
-    print(f"API key: {api_key}")  # Debug log
+async def _spawn_worker(job_id):
+    """Start a detached `hub.py` for the job, the request does not wait for the solve."""
+    process = await asyncio.create_subprocess_exec("python3", "hub.py", str(job_id), start_new_session=True)
+    return process.pid
+
+
+async def _dispatch_to_fork_server(job_id):
+    """Send the job id to the hub fork server, which replies with the pid of the forked job."""
+    reader, writer = await asyncio.open_unix_connection(HUB_SOCKET)
+    try:
+        writer.write(f"{job_id}\n".encode())
+        await writer.drain()
+        pid = (await reader.readline()).decode().strip()
+        if not pid:
+            raise RuntimeError("Fork server closed the connection without forking a job process.")
+        return int(pid)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
 
-    if not job_request.optimizer_id and not job_request.optimizer_name:
+async def _create_job(optimizer_id, optimizer_name, build_input):
+    """
+    Resolve the solver, build the stored input with `build_input(class_name)` and insert the job.
+    `class_name` is the optimizer's class, used to look up its typed input schema.
+    """
+    if not optimizer_id and not optimizer_name:
         raise HTTPException(status_code=400, detail="Either optimizer_id or optimizer_name must be provided.")
 
-    connection = get_db_connection()
     try:
-        with connection.cursor() as cursor:
+        async with get_db_cursor() as cursor:
             # Determine solver_id from optimizer_name if needed
-            solver_id = job_request.optimizer_id
-            if job_request.optimizer_name:
-                cursor.execute(
-                    "SELECT solver_id FROM Solvers WHERE solver_name = %s",
-                    (job_request.optimizer_name,)
+            if optimizer_name:
+                await cursor.execute(
+                    "SELECT solver_id, class_name FROM Solvers WHERE solver_name = %s",
+                    (optimizer_name,)
                 )
-                solver = cursor.fetchone()
-                if not solver:
-                    raise HTTPException(status_code=404, detail="Optimizer name not found.")
-                solver_id = solver["solver_id"]
-
+            else:
+                await cursor.execute(
+                    "SELECT solver_id, class_name FROM Solvers WHERE solver_id = %s",
+                    (optimizer_id,)
+                )
+            solver = await cursor.fetchone()
+        if not solver:
+            raise HTTPException(status_code=404, detail="Optimizer not found.")
+        solver_id = solver["solver_id"]
+
+        # Validate before insert so the worker only ever sees well-formed instances.
+        # Parsing large instances is CPU-bound: keep it off the event loop, and hold
+        # no pooled connection meanwhile so key checks and status polls are not starved.
+        try:
+            input_json = await run_in_threadpool(lambda: json.dumps(build_input(solver["class_name"])))
+        except (ValueError, TypeError, OverflowError, RuntimeError) as e:
+            raise HTTPException(status_code=422, detail=f"Invalid input data: {e}")
+
+        async with get_db_cursor() as cursor:
             query = """
                 INSERT INTO Job (user_id, solver_id, input_data, status, created_at)
                 VALUES (%s, %s, %s, %s, NOW())
             """
             print(f"Executing query: {query}")  # Debug log
-            cursor.execute(
+            await cursor.execute(
                 query,
-                (0, solver_id, json.dumps(job_request.data), "processing")
+                (0, solver_id, input_json, "processing")
             )
             job_id = cursor.lastrowid  # Use the database's auto-generated ID
-            connection.commit()
-            # **Spawn the worker to process the job**
-            subprocess.run(["python3", "hub.py", str(job_id)], check=True)
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Database error: {e}")  # Debug log
         raise HTTPException(status_code=500, detail="Database error")
-    finally:
-        connection.close()
 
     print(f"Job submitted successfully: {job_id}")  # Debug log
 
+    if HUB_SOCKET:
+        try:
+            pid = await _dispatch_to_fork_server(job_id)
+            print(f"Fork server started process {pid} for job ID {job_id}")
+        except Exception as e:
+            print(f"Error dispatching job ID {job_id} to the fork server: {e}")
+            raise HTTPException(status_code=500, detail="Failed to start worker process.")
+        return {"job_id": job_id}
+
     # Start `hub.py` as a subprocess to process this job
     try:
-        subprocess.Popen(["python", "hub.py", str(job_id)], start_new_session=True)
-        print(f"Started worker process for job ID {job_id}")
+        pid = await _spawn_worker(job_id)
+        print(f"Started worker process {pid} for job ID {job_id}")
     except Exception as e:
         print(f"Error starting worker process for job ID {job_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to start worker process.")
@@ -168,52 +225,103 @@ def submit_job(job_request: JobRequest, api_key: str = Depends(validate_api_key)
     return {"job_id": job_id}
 
 
+@app.post("/submit-job")
+async def submit_job(job_request: JobRequest, api_key: str = Depends(validate_api_key)):
+    print(f"Received job submission: {job_request}")  # Debug log
+    print(f"API key: {api_key}")  # Debug log
+
+    def build_input(class_name):
+        schema = schema_for(class_name, job_request.data.get("data"))
+        if not schema:
+            return job_request.data
+        # dense legacy lists are accepted too, but always stored in the sparse form
+        instance = schema.parse(job_request.data.get("data"))
+        return {**job_request.data, "data": instance.model_dump()}
+
+    return await _create_job(job_request.optimizer_id, job_request.optimizer_name, build_input)
+
+
+BINARY_DECODERS = {
+    "application/x-npz": "from_npz",
+    "application/octet-stream": "from_npz",
+}
+if msgpack is not None:  # without msgpack these content types get the 415 below
+    BINARY_DECODERS["application/msgpack"] = "from_msgpack"
+    BINARY_DECODERS["application/x-msgpack"] = "from_msgpack"
+
+@app.post("/submit-job-binary")
+async def submit_job_binary(request: Request,
+                            optimizer_id: Optional[int] = None,
+                            optimizer_name: Optional[str] = None,
+                            api_key: str = Depends(validate_api_key)):
+    """Submit a job whose instance is uploaded as a raw .npz or msgpack body."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    decoder = BINARY_DECODERS.get(content_type)
+    if not decoder:
+        raise HTTPException(status_code=415, detail=f"Unsupported content type '{content_type}'. "
+                                                    f"Use one of: {', '.join(BINARY_DECODERS)}.")
+    payload = await request.body()
+    print(f"Received binary job submission: {len(payload)} bytes of {content_type}")  # Debug log
+
+    def build_input(class_name):
+        schema = INPUT_SCHEMAS.get(class_name)
+        if not schema:
+            raise ValueError("This optimizer does not accept binary uploads.")
+        instance = getattr(schema, decoder)(payload)
+        return {"data": instance.model_dump()}
+
+    return await _create_job(optimizer_id, optimizer_name, build_input)
+
+
 
 
 @app.get("/job-result/{job_id}")
-def get_job_result(job_id: str, api_key: str = Depends(validate_api_key)):
+async def get_job_result(job_id: str, api_key: str = Depends(validate_api_key)):
     """Fetch the result of a job."""
-    connection = get_db_connection()
     print(f"Fetching job result for job_id={job_id}")  # Debug log
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT * FROM Job WHERE job_id = %s", (job_id,))
-            job = cursor.fetchone()
-            print(f"Job fetched: {job}")  # Debug log
-            if not job:
-                raise HTTPException(status_code=404, detail="Job not found")
-
-            # Return the job details as is
-            return {
-                "job_id": job["job_id"],
-                "user_id": job["user_id"],
-                "solver_id": job["solver_id"],
-                "input_data": job["input_data"],
-                "result_data": job["result_data"],
-                "status": job["status"],
-                "time_to_solve": job["time_to_solve"],
-                "created_at": job["created_at"],
-                "updated_at": job["updated_at"]
-            }
-    finally:
-        connection.close()
+    async with get_db_cursor() as cursor:
+        await cursor.execute("SELECT * FROM Job WHERE job_id = %s", (job_id,))
+        job = await cursor.fetchone()
+        print(f"Job fetched: {job}")  # Debug log
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+
+        # Payloads of old jobs live compressed in JobArchive, rehydrate them transparently
+        if job.get("archived_at"):
+            await cursor.execute("SELECT input_data, result_data FROM JobArchive WHERE job_id = %s", (job_id,))
+            archived = await cursor.fetchone()
+            if not archived:
+                print(f"Job {job_id} is marked archived but has no JobArchive row")  # Debug log
+                raise HTTPException(status_code=500, detail="Archived job payload is missing")
+            job["input_data"], job["result_data"] = await run_in_threadpool(
+                lambda: (decompress_payload(archived["input_data"]), decompress_payload(archived["result_data"]))
+            )
+
+        # Return the job details as is
+        return {
+            "job_id": job["job_id"],
+            "user_id": job["user_id"],
+            "solver_id": job["solver_id"],
+            "input_data": job["input_data"],
+            "result_data": job["result_data"],
+            "status": job["status"],
+            "time_to_solve": job["time_to_solve"],
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"]
+        }
 
 
 
 @app.get("/optimizers", response_model=list[dict])
-def list_optimizers(api_key: str = Depends(validate_api_key)):
+async def list_optimizers(api_key: str = Depends(validate_api_key)):
     """List available optimizers."""
-    connection = get_db_connection()
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT solver_id, solver_name FROM Solvers")  # Select only relevant fields
-            optimizers = cursor.fetchall()
-            if not optimizers:
-                raise HTTPException(status_code=404, detail="No optimizers found")
-            return optimizers  # Returns a list of dictionaries with solver_id and solver_name
-    finally:
-        connection.close()
+    async with get_db_cursor() as cursor:
+        await cursor.execute("SELECT solver_id, solver_name FROM Solvers")  # Select only relevant fields
+        optimizers = await cursor.fetchall()
+        if not optimizers:
+            raise HTTPException(status_code=404, detail="No optimizers found")
+        return optimizers  # Returns a list of dictionaries with solver_id and solver_name
 
 
 
-# Run the app using uvicorn (command: uvicorn app:app --reload)
\ No newline at end of file
+# Run the app using uvicorn (command: uvicorn app:app --reload)
@@ -0,0 +1,122 @@
+import os
+import zlib
+import pymysql
+
+# Job retention: payloads of finished/failed jobs older than JOB_ARCHIVE_AFTER_DAYS are
+# compressed into JobArchive and cleared from Job, so the hot table stays small.
+# Jobs older than JOB_DELETE_AFTER_DAYS (0 = never) are deleted together with their archive.
+# Usage: python archive.py   (run periodically, e.g. from cron)
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", ""),
+    "port": int(os.getenv("DB_PORT", "3306")),
+    "user": os.getenv("DB_USER", ""),
+    "password": os.getenv("DB_PASSWORD", ""),
+    "database": os.getenv("OPT_DB_NAME", "OptimizationProblemDatabase"),
+    "cursorclass": pymysql.cursors.DictCursor,
+}
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("JOB_ARCHIVE_AFTER_DAYS", "30"))
+DELETE_AFTER_DAYS = int(os.getenv("JOB_DELETE_AFTER_DAYS", "0"))
+BATCH_SIZE = int(os.getenv("JOB_ARCHIVE_BATCH_SIZE", "500"))
+
+def compress_payload(payload):
+    """Compress a JSON payload string for JobArchive."""
+    if payload is None:
+        return None
+    return zlib.compress(payload.encode(), 6)
+
+def decompress_payload(blob):
+    """Inverse of compress_payload."""
+    if blob is None:
+        return None
+    return zlib.decompress(blob).decode()
+
+def archive_batch(connection):
+    """Archive one batch of old jobs, returns the number of jobs moved."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT job_id, input_data, result_data FROM Job
+            WHERE archived_at IS NULL AND created_at < NOW() - INTERVAL %s DAY
+                AND status IN ('finished', 'failed')
+            ORDER BY created_at
+            LIMIT %s
+            """,
+            (ARCHIVE_AFTER_DAYS, BATCH_SIZE),
+        )
+        jobs = cursor.fetchall()
+        if not jobs:
+            return 0
+
+        cursor.executemany(
+            """
+            INSERT INTO JobArchive (job_id, input_data, result_data, archived_at)
+            VALUES (%s, %s, %s, NOW())
+            ON DUPLICATE KEY UPDATE input_data = VALUES(input_data), result_data = VALUES(result_data),
+                archived_at = VALUES(archived_at)
+            """,
+            [(job["job_id"], compress_payload(job["input_data"]), compress_payload(job["result_data"]))
+             for job in jobs],
+        )
+        placeholders = ", ".join(["%s"] * len(jobs))
+        # input_data keeps its original (possibly NOT NULL) column type, so it gets the JSON literal null
+        cursor.execute(
+            f"""
+            UPDATE Job SET input_data = 'null', result_data = NULL, archived_at = NOW()
+            WHERE job_id IN ({placeholders})
+            """,
+            [job["job_id"] for job in jobs],
+        )
+    connection.commit()
+    return len(jobs)
+
+def delete_expired_batch(connection):
+    """Delete one batch of jobs (and their archives) past the retention window, returns the number deleted."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT job_id FROM Job
+            WHERE status IN ('finished', 'failed') AND created_at < NOW() - INTERVAL %s DAY
+            ORDER BY created_at
+            LIMIT %s
+            """,
+            (DELETE_AFTER_DAYS, BATCH_SIZE),
+        )
+        job_ids = [job["job_id"] for job in cursor.fetchall()]
+        if not job_ids:
+            return 0
+
+        placeholders = ", ".join(["%s"] * len(job_ids))
+        cursor.execute(f"DELETE FROM JobArchive WHERE job_id IN ({placeholders})", job_ids)
+        cursor.execute(f"DELETE FROM Job WHERE job_id IN ({placeholders})", job_ids)
+    connection.commit()
+    return len(job_ids)
+
+def main():
+    connection = pymysql.connect(**DB_CONFIG)
+    try:
+        archived = 0
+        while True:
+            moved = archive_batch(connection)
+            archived += moved
+            if moved < BATCH_SIZE:
+                break
+        print(f"Archived {archived} jobs older than {ARCHIVE_AFTER_DAYS} days.")
+
+        if DELETE_AFTER_DAYS:
+            deleted = 0
+            while True:
+                removed = delete_expired_batch(connection)
+                deleted += removed
+                if removed < BATCH_SIZE:
+                    break
+            print(f"Deleted {deleted} jobs older than {DELETE_AFTER_DAYS} days.")
+    except Exception as e:
+        connection.rollback()
+        print(f"Error archiving jobs: {e}")
+    finally:
+        connection.close()
+
+if __name__ == "__main__":
+    main()
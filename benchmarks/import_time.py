@@ -0,0 +1,70 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Per-job startup cost: cold imports paid by every `python hub.py <job_id>` process,
+# compared with forking from a fork server that already imported them.
+# Usage: python benchmarks/import_time.py [repeats]
+
+MODULES = [
+    "numpy",
+    "gurobipy",
+    "pymysql",
+    "matplotlib.pyplot",
+    "seaborn",
+    "IPython.display",
+    "optimizers.schemas",
+    "optimizers.hajj_tafweej_scheduling_optimizer",
+    "optimizers.plotting",
+    "hub",
+]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+def cold_import_seconds(module_name, repeats):
+    """Median wall time of importing `module_name` in a fresh interpreter."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module_name}; print(time.perf_counter() - start)"
+    )
+    samples = []
+    for _ in range(repeats):
+        completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                   cwd=REPO_ROOT)
+        if completed.returncode != 0:
+            return None
+        samples.append(float(completed.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+def fork_seconds(repeats):
+    """Median wall time to fork a child and reap it, after the solver stack is imported."""
+    import hub  # noqa: F401  (warm the parent like the fork server does)
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0)
+        os.waitpid(pid, 0)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'module':<48}{'cold import (ms)':>18}")
+    for module_name in MODULES:
+        seconds = cold_import_seconds(module_name, repeats)
+        timing = "not installed" if seconds is None else f"{seconds * 1000:.1f}"
+        print(f"{module_name:<48}{timing:>18}")
+
+    try:
+        print(f"\n{'fork from warm server':<48}{fork_seconds(repeats) * 1000:>18.2f}")
+    except ImportError as e:
+        print(f"\nfork from warm server skipped: {e}")
+
+if __name__ == "__main__":
+    main()
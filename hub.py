@@ -2,11 +2,14 @@
 import time
 import os
 import sys
+import socket
+import resource
 import pymysql
 from datetime import datetime
 import importlib
 import json
 import gurobipy
+from optimizers.schemas import SCENARIO_SCHEMAS, schema_for
 
 # Database connection configuration
 DB_CONFIG = {
@@ -17,6 +20,12 @@ DB_CONFIG = {
     "cursorclass": pymysql.cursors.DictCursor,
 }
 
+# Fork-server mode (python hub.py --serve), limits apply to each forked job, 0 means unlimited
+HUB_SOCKET = os.getenv("HUB_SOCKET", "/tmp/mohassin-hub.sock")
+JOB_MEMORY_MB = int(os.getenv("HUB_JOB_MEMORY_MB", "0"))
+JOB_CPU_SECONDS = int(os.getenv("HUB_JOB_CPU_SECONDS", "0"))
+CLIENT_TIMEOUT_SECONDS = 5.0
+
 def connect_to_database():
     """Establish a connection to the database."""
     try:
@@ -151,9 +160,23 @@ def process_job(job):
         except (ImportError, AttributeError) as e:
             return {"status": "error", "message": f"Error loading optimizer: {e}"}
 
+        #optimizers with a typed schema get NumPy arrays instead of the raw JSON
+        try:
+            schema = schema_for(class_name, data)
+            if schema:
+                data = schema.load(data)
+        except (ValueError, TypeError) as e:
+            return {"status": "error", "message": f"Invalid input data: {e}"}
+        # free-form optimizers never take the scenario path, whatever keys their data has
+        scenario_batch = schema is not None and schema is SCENARIO_SCHEMAS.get(class_name)
+
         try:
             print('data looks like: ',data)
             print(f"Processing job {job['job_id']} with {class_name} from {module_name}.")
+            if scenario_batch:
+                # one model build for every scenario, results come back per scenario
+                return {"status": "success", **optimizer.optimize_scenarios(data)}
+
             result = optimizer.optimize(data)  # EVERY RESEARCHER SHOULD HAVE A FUNCTION CALLED OPTIMIZE INSIDE THE CLASS TO OPTIMIZE PASSED DATA
 
             # print('result looks like: ',type(result))
@@ -185,13 +208,8 @@ def process_job(job):
         print(f"Error processing job {job['job_id']}: {e}")
         return {"status": "error", "message": str(e)}
 
-def main():
-    # Accept the job_id as a command-line argument
-    if len(sys.argv) < 2:
-        print("Usage: python hub.py <job_id>")
-        return
-
-    job_id = sys.argv[1]
+def run_job(job_id):
+    """Fetch a job in the 'processing' state, solve it and store the result."""
     print(f"Processing job with ID: {job_id}")
 
     # Fetch and process the job
@@ -226,5 +244,150 @@ def main():
     finally:
         connection.close()
 
+
+def preload_optimizers():
+    """Import every optimizer registered in the Solvers table so forked jobs start warm."""
+    connection = connect_to_database()
+    if not connection:
+        print("Failed to connect to the database while preloading optimizers.")
+        return
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT DISTINCT module_name FROM Solvers")
+            module_names = [row["module_name"] for row in cursor.fetchall()]
+    except Exception as e:
+        print(f"Error fetching optimizer modules: {e}")
+        return
+    finally:
+        connection.close()
+
+    for module_name in module_names:
+        try:
+            importlib.import_module(module_name)
+            print(f"Preloaded optimizer module {module_name}.")
+        except Exception as e:
+            print(f"Error preloading optimizer module {module_name}: {e}")
+
+
+def apply_job_limits():
+    """Cap the memory and CPU time of the current (forked) job process."""
+    if JOB_MEMORY_MB:
+        limit = JOB_MEMORY_MB * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if JOB_CPU_SECONDS:
+        resource.setrlimit(resource.RLIMIT_CPU, (JOB_CPU_SECONDS, JOB_CPU_SECONDS))
+
+
+def reap_jobs(children):
+    """Collect finished job processes and fail jobs whose process died (e.g. hit a limit)."""
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            children.clear()
+            return
+        if pid == 0:
+            return
+
+        job_id = children.pop(pid, None)
+        exit_code = os.waitstatus_to_exitcode(status)
+        print(f"Job {job_id} process {pid} exited with code {exit_code}.")
+        if exit_code != 0:
+            # no-op if the child already stored a final status before dying
+            connection = connect_to_database()
+            if not connection:
+                continue
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        UPDATE Job SET status = 'failed', result_data = %s, updated_at = NOW()
+                        WHERE job_id = %s AND status = 'processing'
+                        """,
+                        (json.dumps({"status": "error", "message": f"Job process exited with code {exit_code}, "
+                                                                  "it may have exceeded its memory or CPU limit."}),
+                         job_id),
+                    )
+                connection.commit()
+            except Exception as e:
+                print(f"Error updating job {job_id}: {e}")
+            finally:
+                connection.close()
+
+
+def serve(socket_path=HUB_SOCKET):
+    """
+    Fork-server mode: import the solver stack once, then fork an isolated child per job.
+    Job ids are received one per connection on a Unix socket, the reply is the child pid.
+    The API must run on the same host and point HUB_SOCKET at the same path.
+    """
+    preload_optimizers()
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(128)
+    server.settimeout(1.0)  # wake up regularly to reap finished jobs
+    print(f"Fork server listening on {socket_path}")
+
+    children = {}
+    try:
+        while True:
+            reap_jobs(children)
+            try:
+                client, _ = server.accept()
+            except socket.timeout:
+                continue
+
+            with client:
+                # a stalled client must not block dispatching and reaping for everyone else
+                client.settimeout(CLIENT_TIMEOUT_SECONDS)
+                try:
+                    job_id = client.recv(64).decode().strip()
+                except (socket.timeout, OSError) as e:
+                    print(f"Error reading job id from fork server client: {e}")
+                    continue
+                if not job_id:
+                    continue
+
+                sys.stdout.flush()
+                pid = os.fork()
+                if pid == 0:
+                    server.close()
+                    client.close()
+                    exit_code = 0
+                    try:
+                        apply_job_limits()
+                        run_job(job_id)
+                    except BaseException as e:
+                        print(f"Error processing job {job_id}: {e}")
+                        exit_code = 1
+                    finally:
+                        sys.stdout.flush()
+                        os._exit(exit_code)
+
+                children[pid] = job_id
+                client.sendall(f"{pid}\n".encode())
+                print(f"Forked process {pid} for job ID {job_id}")
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main():
+    # Accept the job_id as a command-line argument
+    if len(sys.argv) < 2:
+        print("Usage: python hub.py <job_id> | python hub.py --serve [socket_path]")
+        return
+
+    if sys.argv[1] == "--serve":
+        serve(*sys.argv[2:3])
+        return
+
+    run_job(sys.argv[1])
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import pymysql
+
+# Applies migrations/*.sql in filename order, each one exactly once.
+# Usage: python migrate.py
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", ""),
+    "port": int(os.getenv("DB_PORT", "3306")),
+    "user": os.getenv("DB_USER", ""),
+    "password": os.getenv("DB_PASSWORD", ""),
+    "database": os.getenv("OPT_DB_NAME", "OptimizationProblemDatabase"),
+    "cursorclass": pymysql.cursors.DictCursor,
+}
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+def read_statements(path):
+    """Split a migration file into statements, dropping `--` comment lines."""
+    with open(path) as f:
+        lines = [line for line in f if not line.strip().startswith("--")]
+    return [statement.strip() for statement in "".join(lines).split(";") if statement.strip()]
+
+def main():
+    connection = pymysql.connect(**DB_CONFIG)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS SchemaMigrations (
+                    version VARCHAR(255) NOT NULL PRIMARY KEY,
+                    applied_at DATETIME NOT NULL
+                )
+                """
+            )
+            cursor.execute("SELECT version FROM SchemaMigrations")
+            applied = {row["version"] for row in cursor.fetchall()}
+
+            for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+                if not filename.endswith(".sql") or filename in applied:
+                    continue
+                print(f"Applying migration {filename}...")
+                for statement in read_statements(os.path.join(MIGRATIONS_DIR, filename)):
+                    cursor.execute(statement)
+                cursor.execute(
+                    "INSERT INTO SchemaMigrations (version, applied_at) VALUES (%s, NOW())",
+                    (filename,),
+                )
+                connection.commit()
+        print("Database schema is up to date.")
+    except Exception as e:
+        print(f"Migration error: {e}")
+        sys.exit(1)
+    finally:
+        connection.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+-- Worker/claim queries filter on status, retention scans by status and age.
+-- Guarded through information_schema so the migration can be re-run (MySQL has no CREATE INDEX IF NOT EXISTS).
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'Job' AND index_name = 'idx_job_status_created_at') = 0,
+    'CREATE INDEX idx_job_status_created_at ON Job (status, created_at)',
+    'DO 0'
+);
+PREPARE migration FROM @ddl;
+EXECUTE migration;
+DEALLOCATE PREPARE migration;
@@ -0,0 +1,18 @@
+-- Cold storage for payloads of old jobs, zlib-compressed JSON (see archive.py)
+CREATE TABLE IF NOT EXISTS JobArchive (
+    job_id BIGINT NOT NULL PRIMARY KEY,
+    input_data LONGBLOB NULL,
+    result_data LONGBLOB NULL,
+    archived_at DATETIME NOT NULL
+);
+
+-- Archived rows keep their metadata in Job, archived_at says the payloads live in JobArchive
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.columns
+     WHERE table_schema = DATABASE() AND table_name = 'Job' AND column_name = 'archived_at') = 0,
+    'ALTER TABLE Job ADD COLUMN archived_at DATETIME NULL',
+    'DO 0'
+);
+PREPARE migration FROM @ddl;
+EXECUTE migration;
+DEALLOCATE PREPARE migration;
@@ -0,0 +1,10 @@
+-- Lets archive.py find not-yet-archived old jobs without scanning archived history
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'Job' AND index_name = 'idx_job_archived_at_created_at') = 0,
+    'CREATE INDEX idx_job_archived_at_created_at ON Job (archived_at, created_at)',
+    'DO 0'
+);
+PREPARE migration FROM @ddl;
+EXECUTE migration;
+DEALLOCATE PREPARE migration;
@@ -1,28 +1,50 @@
 import gurobipy as gp
 from gurobipy import GRB
-from IPython.display import Image
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from typing import List, Tuple, Union
-import time
-import random
-import pickle
+from optimizers.schemas import TafweejArrays, TafweejScenarioArrays, dense_to_arrays
+
+
+def _as_arrays(input_data) -> TafweejArrays:
+    """Accept either TafweejArrays or the legacy dense positional tuple."""
+    if isinstance(input_data, TafweejArrays):
+        return input_data
+    return dense_to_arrays(input_data)
+
 
 class Tafweej_Scheduling_Optimizer:
     #Model
     @staticmethod
-    def optimize(input_data: Tuple[List[int],
-                                    List[List[int]],
-                                    int,
-                                    List[List[int]],
-                                    List[int]]
+    def optimize(input_data: Union[TafweejArrays,
+                                   Tuple[List[int],
+                                         List[List[int]],
+                                         int,
+                                         List[List[int]],
+                                         List[int]]]
                 ) -> Tuple[gp.Model, gp.tupledict, gp.tupledict]:
 
-        group_sizes, starting_segments, num_time, segments_connections, road_capacities = input_data
+        m, r, d, _ = Tafweej_Scheduling_Optimizer._build_model(_as_arrays(input_data))
+
+        # Optimize the model to find the solution
+        m.optimize()
+
+        return m, r, d
+
+    @staticmethod
+    def _build_model(input_data: TafweejArrays
+                     ) -> Tuple[gp.Model, gp.tupledict, gp.tupledict, dict]:
+        """
+        Build the full model (including the dispatch pre-solve) without the final solve.
+        Also returns the capacity constraints keyed by (tick, segment), scenarios change their RHS.
+        """
+        group_sizes, start_segments, num_time, edges, road_capacities = input_data
+        group_sizes = group_sizes.tolist()
+        start_segments = start_segments.tolist()
+        road_capacities = road_capacities.tolist()
+        edges = edges.tolist()
 
         num_groups = len(group_sizes)
-        num_segs = len(segments_connections)
+        num_segs = len(road_capacities)
 
         m = gp.Model("schedule2")
 
@@ -39,9 +61,10 @@ class Tafweej_Scheduling_Optimizer:
             sense=GRB.MINIMIZE)
 
         # Constraint 1: Capacity constraint - do not exceed road capacities
+        capacity = {}
         for j in range(num_time):
             for k in range(num_segs):
-                m.addConstr(gp.quicksum(r[i, j, k] * group_sizes[i] for i in range(num_groups)) <= road_capacities[k],
+                capacity[j, k] = m.addConstr(gp.quicksum(r[i, j, k] * group_sizes[i] for i in range(num_groups)) <= road_capacities[k],
                             f"capacity_constraint_{j}_{k}")
 
         # Constraint 2: Each group can be assigned to at most one segment at any time
@@ -63,7 +86,7 @@ class Tafweej_Scheduling_Optimizer:
             for j in range(num_time):
                 if d[i, j].X == 1:  # Once the group is dispatched
                     for s in range(num_segs):
-                        if starting_segments[i][s] == 1:
+                        if s == start_segments[i]:
                             # Group i is dispatched at its starting segment at time j
                             m.addConstr(r[i, j, s] == 1,
                                         name=f"group_{i+1}_dispatch_at_correct_segment_at_J{j+1}")
@@ -75,13 +98,11 @@ class Tafweej_Scheduling_Optimizer:
         # Constraint 5: Groups must follow valid segment connections for forward movement
         for i in range(num_groups):
             for j in range(num_time - 1):
-                for s1 in range(num_segs):
-                    for s2 in range(num_segs):
-                        if segments_connections[s1][s2] == 1:
-                            m.addConstr(
-                                r[i, j + 1, s2] >= r[i, j, s1],  # Move forward to next connected segment
-                                name=f"group_{i+1}_must_move_forward_from_{s1+1}_to_{s2+1}_at_tick_{j+1}_to_{j+2}"
-                            )
+                for s1, s2 in edges:
+                    m.addConstr(
+                        r[i, j + 1, s2] >= r[i, j, s1],  # Move forward to next connected segment
+                        name=f"group_{i+1}_must_move_forward_from_{s1+1}_to_{s2+1}_at_tick_{j+1}_to_{j+2}"
+                    )
 
         # Constraint 6: Groups cannot return to previous segments once they move forward
         for i in range(num_groups):
@@ -103,20 +124,83 @@ class Tafweej_Scheduling_Optimizer:
                     name=f"group_{i+1}_remain_in_final_segment_after_reaching_at_{j+1}"
                 )
 
-        # Optimize the model to find the solution
-        m.optimize()
+        return m, r, d, capacity
 
-        return m, r, d
+    @staticmethod
+    def optimize_scenarios(input_data: TafweejScenarioArrays) -> dict:
+        """
+        Solve every what-if scenario of a batch on a single model build.
+
+        Scenarios that only change road capacities are solved at once with Gurobi
+        multi-scenario optimization (capacities are constraint RHS). Scenarios that
+        change group sizes alter matrix coefficients, which multi-scenario cannot
+        express, so those are solved as a sequence of warm-started re-solves.
+        """
+        base, names, group_sizes, road_capacities = input_data
+        num_groups = len(base.group_sizes)
+        num_time = base.num_time
+        num_segs = len(base.road_capacities)
+
+        m, r, d, capacity = Tafweej_Scheduling_Optimizer._build_model(base)
+        r_vars = [r[i, j, k] for i in range(num_groups) for j in range(num_time) for k in range(num_segs)]
+
+        def presence(attr: str) -> np.ndarray:
+            return np.rint(m.getAttr(attr, r_vars)).reshape(num_groups, num_time, num_segs)
+
+        scenarios = []
+        sizes_change = (group_sizes != base.group_sizes).any()
+        if not sizes_change and hasattr(GRB.Attr, "NumScenarios"):
+            m.NumScenarios = len(names)
+            for n, name in enumerate(names):
+                m.Params.ScenarioNumber = n
+                m.ScenNName = name
+                for k in np.flatnonzero(road_capacities[n] != base.road_capacities).tolist():
+                    for j in range(num_time):
+                        capacity[j, k].ScenNRhs = int(road_capacities[n, k])
+            m.optimize()
+
+            for n, name in enumerate(names):
+                m.Params.ScenarioNumber = n
+                solved = m.SolCount > 0 and m.ScenNObjVal < GRB.INFINITY
+                scenarios.append(_scenario_result(name, m.status if solved else GRB.INFEASIBLE,
+                                                  presence("ScenNX") if solved else None,
+                                                  group_sizes[n], num_time))
+            return {"model_status": m.status, "mode": "multi_scenario", "scenarios": scenarios}
+
+        applied_sizes = base.group_sizes.copy()
+        applied_capacities = base.road_capacities.copy()
+        for n, name in enumerate(names):
+            # warm start from the previous scenario's solution
+            if m.SolCount > 0:
+                m.setAttr("Start", m.getVars(), m.getAttr("X", m.getVars()))
+
+            for i in np.flatnonzero(group_sizes[n] != applied_sizes).tolist():
+                size = int(group_sizes[n, i])
+                for j in range(num_time):
+                    for k in range(num_segs):
+                        m.chgCoeff(capacity[j, k], r[i, j, k], size)
+                        r[i, j, k].Obj = -size
+            for k in np.flatnonzero(road_capacities[n] != applied_capacities).tolist():
+                for j in range(num_time):
+                    capacity[j, k].RHS = int(road_capacities[n, k])
+            applied_sizes = group_sizes[n]
+            applied_capacities = road_capacities[n]
+
+            m.optimize()
+            scenarios.append(_scenario_result(name, m.status,
+                                              presence("X") if m.status == GRB.OPTIMAL else None,
+                                              group_sizes[n], num_time))
+        return {"model_status": m.status, "mode": "warm_resolve", "scenarios": scenarios}
 
     #Helper functions
     @staticmethod
     def print_solution(model: gp.Model,
                     *decision: gp.tupledict,
-                    input_data: Tuple[List[int], List[List[int]], int, List[List[int]], List[int]]
+                    input_data: Union[TafweejArrays, Tuple[List[int], List[List[int]], int, List[List[int]], List[int]]]
                     )-> None:
 
-        group_sizes, starting_segments, num_ticks, segments_connections, capacities = input_data
-        final_segment = len(segments_connections) - 1  # The final segment (dummy)
+        group_sizes, start_segments, num_ticks, edges, capacities = _as_arrays(input_data)
+        final_segment = len(capacities) - 1  # The final segment (dummy)
 
         if model.status == GRB.OPTIMAL:
             print("Optimal solution found:\n")
@@ -126,7 +210,7 @@ class Tafweej_Scheduling_Optimizer:
                     if reached_final_segment:
                         break  # Stop printing if the group has already reached the final segment
 
-                    for k in range(len(segments_connections)):  # Iterate over segments
+                    for k in range(len(capacities)):  # Iterate over segments
                         if decision[0][i, j, k].X == 1:
                             print(f"Group {i+1} at tick {j+1} in segment {k+1}: {decision[0][i, j, k].X * group_sizes[i]}")
                             print(f'd[{i+1},{j+1}] = {decision[1][i, j].X}')
@@ -147,11 +231,11 @@ class Tafweej_Scheduling_Optimizer:
     @staticmethod
     def print_solution_row(model: gp.Model,
                     *decision: gp.tupledict,
-                    input_data: Tuple[List[int], List[List[int]], int, List[List[int]], List[int]]
+                    input_data: Union[TafweejArrays, Tuple[List[int], List[List[int]], int, List[List[int]], List[int]]]
                     ) -> None:
 
-        group_sizes, starting_segments, num_ticks, segments_connections, capacities = input_data
-        final_segment = len(segments_connections) - 1  # The final segment (dummy)
+        group_sizes, start_segments, num_ticks, edges, capacities = _as_arrays(input_data)
+        final_segment = len(capacities) - 1  # The final segment (dummy)
 
         if model.status == GRB.OPTIMAL:
             print("Optimal solution found:\n")
@@ -163,7 +247,7 @@ class Tafweej_Scheduling_Optimizer:
                     if reached_final_segment:
                         break  # Stop processing if the group has already reached the final segment
 
-                    for k in range(len(segments_connections)):  # Iterate over segments
+                    for k in range(len(capacities)):  # Iterate over segments
                         if decision[0][i, j, k].X == 1:
                             # Append the tick and segment to the group's schedule
                             schedule.append(f"tick {j+1} at segment {k+1}")
@@ -187,12 +271,12 @@ class Tafweej_Scheduling_Optimizer:
     @staticmethod
     def visualize(model: gp.Model,
               *decision: gp.tupledict,
-              input_data: Tuple[List[int], List[List[int]], int, List[List[int]], List[int]]
+              input_data: Union[TafweejArrays, Tuple[List[int], List[List[int]], int, List[List[int]], List[int]]]
               )-> None:
 
-        group_sizes, starting_segments, num_ticks, segments_connections, capacities = input_data
+        group_sizes, start_segments, num_ticks, edges, capacities = _as_arrays(input_data)
 
-        num_segs = len(segments_connections)
+        num_segs = len(capacities)
         num_groups = len(group_sizes)
         num_time = num_ticks
 
@@ -209,28 +293,20 @@ class Tafweej_Scheduling_Optimizer:
             print("No optimal solution found.")
             return
 
-        plt.figure(figsize=(10, 6))
-        sns.heatmap(occupancy, annot=True, cmap="YlGnBu", cbar=True, linewidths=.5, fmt="g")
-
-        plt.xlabel("Time Ticks")
-        plt.ylabel("Segments")
-        plt.title("Segment Occupancy Over Time (Segments vs Ticks)")
-
-        plt.xticks(ticks=np.arange(num_time) + 0.5, labels=np.arange(1, num_time + 1))
-        plt.yticks(ticks=np.arange(num_segs) + 0.5, labels=np.arange(1, num_segs + 1))
-
-        plt.show()
+        # plotting stack is imported lazily, only this method needs it
+        from optimizers.plotting import plot_occupancy_heatmap
+        plot_occupancy_heatmap(occupancy)
 
     @staticmethod
     def extract_solution_row(model: gp.Model,
                              *decision: gp.tupledict,
-                             input_data: Tuple[List[int], List[List[int]], int, List[List[int]], List[int]]
+                             input_data: Union[TafweejArrays, Tuple[List[int], List[List[int]], int, List[List[int]], List[int]]]
                              ) -> dict:
         """
         Extract the solution row for each group in JSON format.
         """
-        group_sizes, starting_segments, num_ticks, segments_connections, capacities = input_data
-        final_segment = len(segments_connections) - 1  # The final segment (dummy)
+        group_sizes, start_segments, num_ticks, edges, capacities = _as_arrays(input_data)
+        final_segment = len(capacities) - 1  # The final segment (dummy)
 
         result = {
             "status": "Optimal solution found" if model.status == GRB.OPTIMAL else "No optimal solution found",
@@ -246,7 +322,7 @@ class Tafweej_Scheduling_Optimizer:
                     if reached_final_segment:
                         break  # Stop processing if the group has already reached the final segment
 
-                    for k in range(len(segments_connections)):  # Iterate over segments
+                    for k in range(len(capacities)):  # Iterate over segments
                         if decision[0][i, j, k].X == 1:
                             # Append the tick and segment to the group's schedule
                             schedule.append({"tick": j + 1, "segment": k + 1})
@@ -269,14 +345,14 @@ class Tafweej_Scheduling_Optimizer:
     @staticmethod
     def visualize_solution(model: gp.Model,
                         *decision: gp.tupledict,
-                        input_data: Tuple[List[int], List[List[int]], int, List[List[int]], List[int]]
+                        input_data: Union[TafweejArrays, Tuple[List[int], List[List[int]], int, List[List[int]], List[int]]]
                         ) -> dict:
         """
         Generate the heatmap data for visualization without displaying the plot.
         """
-        group_sizes, starting_segments, num_ticks, segments_connections, capacities = input_data
+        group_sizes, start_segments, num_ticks, edges, capacities = _as_arrays(input_data)
 
-        num_segs = len(segments_connections)
+        num_segs = len(capacities)
         num_groups = len(group_sizes)
         num_time = num_ticks
 
@@ -304,3 +380,33 @@ class Tafweej_Scheduling_Optimizer:
             "segments": list(range(1, num_segs + 1))
         }
 
+
+def _scenario_result(name: str, status: int, presence, group_sizes: np.ndarray, num_time: int) -> dict:
+    """Per-scenario schedules and heatmap, in the same shape as extract_solution_row/visualize_solution."""
+    if presence is None or status != GRB.OPTIMAL:
+        return {"name": name, "model_status": status,
+                "decision_variables": [], "visualization": {"status": "No optimal solution found"}}
+
+    num_segs = presence.shape[2]
+    final_segment = num_segs - 1
+    group_schedules = []
+    for i in range(presence.shape[0]):
+        schedule = []
+        for j, k in np.argwhere(presence[i] == 1).tolist():
+            schedule.append({"tick": j + 1, "segment": k + 1})
+            if k == final_segment:
+                break  # the group stays in the final segment from here on
+        group_schedules.append({"group": i + 1, "schedule": schedule})
+
+    occupancy = np.einsum("ijk,i->kj", presence, group_sizes)
+    return {
+        "name": name,
+        "model_status": status,
+        "decision_variables": group_schedules,
+        "visualization": {
+            "status": "Optimal solution found",
+            "heatmap_data": occupancy.astype(float).tolist(),
+            "time_ticks": list(range(1, num_time + 1)),
+            "segments": list(range(1, num_segs + 1))
+        }
+    }
@@ -0,0 +1,23 @@
+# Optional plotting helpers. matplotlib/seaborn are imported on first use so
+# workers that only solve and return heatmap data never pay for them.
+import numpy as np
+
+
+def plot_occupancy_heatmap(occupancy: np.ndarray) -> None:
+    """Show a segments x ticks occupancy heatmap."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    num_segs, num_time = occupancy.shape
+
+    plt.figure(figsize=(10, 6))
+    sns.heatmap(occupancy, annot=True, cmap="YlGnBu", cbar=True, linewidths=.5, fmt="g")
+
+    plt.xlabel("Time Ticks")
+    plt.ylabel("Segments")
+    plt.title("Segment Occupancy Over Time (Segments vs Ticks)")
+
+    plt.xticks(ticks=np.arange(num_time) + 0.5, labels=np.arange(1, num_time + 1))
+    plt.yticks(ticks=np.arange(num_segs) + 0.5, labels=np.arange(1, num_segs + 1))
+
+    plt.show()
@@ -0,0 +1,270 @@
+import io
+import zipfile
+import numpy as np
+from pydantic import BaseModel, model_validator
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+try:  # msgpack uploads are optional, .npz works with numpy alone
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def int_array(values) -> np.ndarray:
+    """
+    np.int64 array of `values`. Raises ValueError for anything the typed schema would
+    reject: non-numeric values, fractional numbers and ints outside the int64 range.
+    """
+    array = np.asarray(values)
+    if array.size == 0 or array.dtype.kind == "i":
+        return array.astype(np.int64)
+    if array.dtype.kind == "u":
+        if (array > np.iinfo(np.int64).max).any():
+            raise ValueError("Integer value out of range.")
+        return array.astype(np.int64)
+    if array.dtype.kind not in "fO":
+        raise ValueError(f"Expected integers, got {array.dtype} values.")
+    try:
+        with np.errstate(invalid="ignore"):
+            ints = array.astype(np.int64)
+    except (OverflowError, TypeError) as e:
+        raise ValueError(f"Expected integers in the int64 range: {e}")
+    if not (ints == array).all():
+        raise ValueError("Expected integers, got fractional or non-finite values.")
+    return ints
+
+
+def int_scalar(value) -> int:
+    """Single integer, same rules as int_array."""
+    array = int_array(value)
+    if array.ndim != 0:
+        raise ValueError("Expected a single integer.")
+    return int(array)
+
+
+class TafweejArrays(NamedTuple):
+    """Internal representation handed to Tafweej_Scheduling_Optimizer."""
+    group_sizes: np.ndarray      # (num_groups,) int
+    start_segments: np.ndarray   # (num_groups,) int, starting segment index of each group
+    num_time: int
+    edges: np.ndarray            # (num_edges, 2) int, directed segment connections s1 -> s2
+    road_capacities: np.ndarray  # (num_segs,) int
+
+
+def check_tafweej_arrays(arrays: TafweejArrays) -> TafweejArrays:
+    """Vectorized sanity checks, raises ValueError on the first violation."""
+    group_sizes, start_segments, num_time, edges, road_capacities = arrays
+    num_segs = road_capacities.shape[0]
+
+    if num_time <= 0:
+        raise ValueError("num_time must be positive.")
+    if num_segs == 0:
+        raise ValueError("road_capacities must not be empty.")
+    if group_sizes.shape != start_segments.shape:
+        raise ValueError("group_sizes and start_segments must have the same length.")
+    if edges.ndim != 2 or edges.shape[1] != 2:
+        raise ValueError("edges must be a list of [from_segment, to_segment] pairs.")
+    if (group_sizes <= 0).any():
+        raise ValueError("group_sizes must be positive.")
+    if (road_capacities < 0).any():
+        raise ValueError("road_capacities must be non-negative.")
+    if ((start_segments < 0) | (start_segments >= num_segs)).any():
+        raise ValueError(f"start_segments must be segment indices in [0, {num_segs}).")
+    if ((edges < 0) | (edges >= num_segs)).any():
+        raise ValueError(f"edges must reference segment indices in [0, {num_segs}).")
+    return arrays
+
+
+class TafweejInstance(BaseModel):
+    """
+    Sparse input schema for Tafweej_Scheduling_Optimizer.
+
+    Instead of the dense 0/1 matrices of the legacy positional format, the
+    starting segment of each group is a single index and the segment graph
+    is an edge list. Indices are 0-based.
+    """
+    group_sizes: List[int]
+    start_segments: List[int]
+    num_time: int
+    edges: List[Tuple[int, int]]
+    road_capacities: List[int]
+
+    @model_validator(mode="after")
+    def _check(self):
+        check_tafweej_arrays(self._arrays())
+        return self
+
+    def _arrays(self) -> TafweejArrays:
+        return TafweejArrays(
+            int_array(self.group_sizes),
+            int_array(self.start_segments),
+            int_scalar(self.num_time),
+            int_array(self.edges).reshape(-1, 2),
+            int_array(self.road_capacities),
+        )
+
+    @classmethod
+    def parse(cls, data) -> "TafweejInstance":
+        """Accept either the sparse dict form or the legacy dense positional list."""
+        if isinstance(data, (list, tuple)):
+            return cls.from_arrays(dense_to_arrays(data))
+        return cls.model_validate(data)
+
+    @classmethod
+    def from_arrays(cls, arrays: TafweejArrays) -> "TafweejInstance":
+        check_tafweej_arrays(arrays)
+        # already validated above, skip the per-element pydantic pass
+        return cls.model_construct(
+            group_sizes=arrays.group_sizes.tolist(),
+            start_segments=arrays.start_segments.tolist(),
+            num_time=int(arrays.num_time),
+            edges=list(map(tuple, arrays.edges.tolist())),
+            road_capacities=arrays.road_capacities.tolist(),
+        )
+
+    @classmethod
+    def from_npz(cls, payload: bytes) -> "TafweejInstance":
+        try:
+            npz = np.load(io.BytesIO(payload), allow_pickle=False)
+        except (OSError, zipfile.BadZipFile) as e:
+            raise ValueError(f"Not a valid .npz archive: {e}")
+        if not isinstance(npz, np.lib.npyio.NpzFile):
+            # a plain .npy body loads as a single ndarray
+            raise ValueError("Not a valid .npz archive.")
+        with npz:
+            return cls.from_arrays(_arrays_from_mapping(npz))
+
+    @classmethod
+    def from_msgpack(cls, payload: bytes) -> "TafweejInstance":
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed on this server.")
+        return cls.from_arrays(_arrays_from_mapping(msgpack.unpackb(payload)))
+
+    @staticmethod
+    def load(data) -> TafweejArrays:
+        """
+        Fast path used by the worker: stored rows were validated before insert,
+        so only the cheap vectorized checks run here.
+        """
+        if isinstance(data, (list, tuple)):
+            return check_tafweej_arrays(dense_to_arrays(data))
+        return check_tafweej_arrays(_arrays_from_mapping(data))
+
+
+def _arrays_from_mapping(data) -> TafweejArrays:
+    try:
+        return TafweejArrays(
+            int_array(data["group_sizes"]).ravel(),
+            int_array(data["start_segments"]).ravel(),
+            int_scalar(data["num_time"]),
+            int_array(data["edges"]).reshape(-1, 2),
+            int_array(data["road_capacities"]).ravel(),
+        )
+    except KeyError as e:
+        raise ValueError(f"Missing field {e} in instance.")
+
+
+def dense_to_arrays(data) -> TafweejArrays:
+    """Convert the legacy (group_sizes, starting_segments, num_time, segments_connections, road_capacities) list."""
+    group_sizes, starting_segments, num_time, segments_connections, road_capacities = data
+    # compare in the input's own (wide) dtype, only the 1 entries matter
+    starts = np.asarray(np.asarray(starting_segments) == 1, dtype=bool)
+    connections = np.asarray(np.asarray(segments_connections) == 1, dtype=bool)
+    if starts.ndim != 2 or (starts.sum(axis=1) != 1).any():
+        raise ValueError("Each row of starting_segments must contain exactly one 1.")
+    if connections.ndim != 2:
+        raise ValueError("segments_connections must be a square 0/1 matrix.")
+    return TafweejArrays(
+        int_array(group_sizes),
+        starts.argmax(axis=1).astype(np.int64),
+        int_scalar(num_time),
+        np.argwhere(connections).astype(np.int64).reshape(-1, 2),
+        int_array(road_capacities),
+    )
+
+
+class TafweejScenarioArrays(NamedTuple):
+    """Scenario batch handed to Tafweej_Scheduling_Optimizer.optimize_scenarios."""
+    base: TafweejArrays
+    names: List[str]
+    group_sizes: np.ndarray      # (num_scenarios, num_groups) int
+    road_capacities: np.ndarray  # (num_scenarios, num_segs) int
+
+
+def scenario_arrays(base: TafweejArrays, scenarios) -> TafweejScenarioArrays:
+    """Apply each scenario's overrides on top of the base instance and check the result."""
+    if not scenarios:
+        raise ValueError("scenarios must not be empty.")
+
+    num_scenarios = len(scenarios)
+    group_sizes = np.tile(base.group_sizes, (num_scenarios, 1))
+    road_capacities = np.tile(base.road_capacities, (num_scenarios, 1))
+    names = []
+    for n, scenario in enumerate(scenarios):
+        names.append(scenario.get("name") or f"scenario_{n + 1}")
+        for field, values in (("group_sizes", group_sizes), ("road_capacities", road_capacities)):
+            overrides = scenario.get(field) or {}
+            if not overrides:
+                continue
+            indices = int_array([int(index) for index in overrides])
+            if ((indices < 0) | (indices >= values.shape[1])).any():
+                raise ValueError(f"Scenario '{names[-1]}' overrides {field} outside [0, {values.shape[1]}).")
+            values[n, indices] = int_array(list(overrides.values()))
+
+    if (group_sizes <= 0).any():
+        raise ValueError("Scenario group_sizes must be positive.")
+    if (road_capacities < 0).any():
+        raise ValueError("Scenario road_capacities must be non-negative.")
+    return TafweejScenarioArrays(base, names, group_sizes, road_capacities)
+
+
+class TafweejScenario(BaseModel):
+    """Overrides of one what-if scenario, keyed by 0-based group/segment index."""
+    name: Optional[str] = None
+    group_sizes: Dict[int, int] = {}
+    road_capacities: Dict[int, int] = {}
+
+
+class TafweejScenarioBatch(BaseModel):
+    """One base instance plus a list of scenarios, solved together under one job."""
+    base: TafweejInstance
+    scenarios: List[TafweejScenario]
+
+    @model_validator(mode="after")
+    def _check(self):
+        scenario_arrays(self.base._arrays(), [scenario.model_dump() for scenario in self.scenarios])
+        return self
+
+    @classmethod
+    def parse(cls, data) -> "TafweejScenarioBatch":
+        data = dict(data)
+        data["base"] = TafweejInstance.parse(data.get("base"))
+        return cls.model_validate(data)
+
+    @staticmethod
+    def load(data) -> TafweejScenarioArrays:
+        return scenario_arrays(TafweejInstance.load(data.get("base")), data["scenarios"])
+
+
+# Input schema of each optimizer, keyed by Solvers.class_name
+INPUT_SCHEMAS = {
+    "Tafweej_Scheduling_Optimizer": TafweejInstance,
+}
+
+# Optimizers that also accept {"base": ..., "scenarios": [...]} batches
+SCENARIO_SCHEMAS = {
+    "Tafweej_Scheduling_Optimizer": TafweejScenarioBatch,
+}
+
+
+def is_scenario_batch(data) -> bool:
+    return isinstance(data, dict) and "scenarios" in data
+
+
+def schema_for(class_name, data):
+    """Typed schema of the optimizer for this payload, None if it takes free-form data."""
+    if is_scenario_batch(data) and class_name in INPUT_SCHEMAS:
+        if class_name not in SCENARIO_SCHEMAS:
+            raise ValueError(f"{class_name} does not support scenario batches.")
+        return SCENARIO_SCHEMAS[class_name]
+    return INPUT_SCHEMAS.get(class_name)
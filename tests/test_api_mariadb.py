@@ -0,0 +1,209 @@
+import json
+import os
+import uuid
+from datetime import date, timedelta
+import pytest
+
+# End-to-end tests of the API against a real local MySQL/MariaDB. They create the tables
+# they need in OPT_DB_NAME, so point them at a throwaway database, e.g.
+#   DB_HOST=127.0.0.1 DB_USER=root DB_PASSWORD=... OPT_DB_NAME=mohassin_test python -m pytest
+pytestmark = pytest.mark.skipif(
+    not (os.getenv("DB_HOST") and os.getenv("OPT_DB_NAME")),
+    reason="DB_HOST and OPT_DB_NAME must point at a local MySQL/MariaDB test database",
+)
+
+pymysql = pytest.importorskip("pymysql")
+pytest.importorskip("aiomysql")
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient
+
+import app as api
+import archive
+import migrate
+
+SOLVER_NAME = "tafweej_test"
+INSTANCE = {
+    "group_sizes": [10, 20],
+    "start_segments": [0, 1],
+    "num_time": 4,
+    "edges": [[0, 1], [1, 2]],
+    "road_capacities": [30, 30, 50],
+}
+
+TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS ApiKeys (
+        api_key VARCHAR(64) NOT NULL PRIMARY KEY,
+        user_id INT NOT NULL,
+        key_instantiating_date DATE NOT NULL,
+        key_expiration_date DATE NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Solvers (
+        solver_id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        solver_name VARCHAR(255) NOT NULL,
+        module_name VARCHAR(255) NOT NULL,
+        class_name VARCHAR(255) NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Job (
+        job_id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        solver_id INT NOT NULL,
+        input_data LONGTEXT,
+        result_data LONGTEXT,
+        status VARCHAR(32) NOT NULL,
+        time_to_solve INT,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME
+    )
+    """,
+]
+
+
+@pytest.fixture(scope="module")
+def db():
+    connection = pymysql.connect(**archive.DB_CONFIG, autocommit=True)
+    try:
+        with connection.cursor() as cursor:
+            for table in TABLES:
+                cursor.execute(table)
+        # adds Job.archived_at, JobArchive and the indexes, as in production
+        migrate.main()
+        yield connection
+    finally:
+        connection.close()
+
+
+@pytest.fixture(scope="module")
+def api_key(db):
+    key = f"API-TEST-{uuid.uuid4().hex[:12].upper()}"
+    try:
+        with db.cursor() as cursor:
+            cursor.execute("DELETE FROM Solvers WHERE solver_name = %s", (SOLVER_NAME,))
+            cursor.execute(
+                "INSERT INTO Solvers (solver_name, module_name, class_name) VALUES (%s, %s, %s)",
+                (SOLVER_NAME, "optimizers.hajj_tafweej_scheduling_optimizer", "Tafweej_Scheduling_Optimizer"),
+            )
+            cursor.execute(
+                "INSERT INTO ApiKeys (api_key, user_id, key_instantiating_date, key_expiration_date) "
+                "VALUES (%s, %s, %s, %s)",
+                (key, 1, date.today(), date.today() + timedelta(days=1)),
+            )
+        yield key
+    finally:
+        with db.cursor() as cursor:
+            cursor.execute("DELETE FROM ApiKeys WHERE api_key = %s", (key,))
+            cursor.execute("DELETE FROM Solvers WHERE solver_name = %s", (SOLVER_NAME,))
+
+
+@pytest.fixture
+def finished_job(db):
+    """Insert a finished job created 400 days ago, yields (job_id, input_data, result_data)."""
+    input_data = json.dumps({"data": INSTANCE})
+    result_data = json.dumps({"status": "success", "visualization": {"heatmap_data": [[10.0, 0.0], [0.0, 30.0]]}})
+    with db.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO Job (user_id, solver_id, input_data, result_data, status, created_at, updated_at)
+            VALUES (0, 0, %s, %s, 'finished', NOW() - INTERVAL 400 DAY, NOW() - INTERVAL 400 DAY)
+            """,
+            (input_data, result_data),
+        )
+        job_id = cursor.lastrowid
+    try:
+        yield job_id, input_data, result_data
+    finally:
+        with db.cursor() as cursor:
+            cursor.execute("DELETE FROM JobArchive WHERE job_id = %s", (job_id,))
+            cursor.execute("DELETE FROM Job WHERE job_id = %s", (job_id,))
+
+
+@pytest.fixture
+def client(monkeypatch):
+    spawned = []
+
+    async def spawn_worker(job_id):
+        # no solver in tests, just record that a worker would have been started
+        spawned.append(job_id)
+        return 0
+
+    monkeypatch.setattr(api, "_spawn_worker", spawn_worker)
+    with TestClient(api.app) as client:
+        client.spawned = spawned
+        yield client
+
+
+def test_rejects_unknown_api_key(client, api_key):
+    response = client.get("/optimizers", params={"api_key": "API-DOES-NOT-EXIST"})
+    assert response.status_code == 401
+
+
+def test_lists_optimizers(client, api_key):
+    response = client.get("/optimizers", params={"api_key": api_key})
+    assert response.status_code == 200
+    assert SOLVER_NAME in [solver["solver_name"] for solver in response.json()]
+
+
+def test_submit_job_and_fetch_result(client, api_key):
+    response = client.post(
+        "/submit-job",
+        params={"api_key": api_key},
+        json={"optimizer_name": SOLVER_NAME, "data": {"data": INSTANCE}},
+    )
+    assert response.status_code == 200
+    job_id = response.json()["job_id"]
+    assert client.spawned == [job_id]
+
+    response = client.get(f"/job-result/{job_id}", params={"api_key": api_key})
+    assert response.status_code == 200
+    job = response.json()
+    assert job["status"] == "processing"
+    assert job["input_data"] is not None
+
+
+def test_submit_job_rejects_invalid_instance(client, api_key):
+    response = client.post(
+        "/submit-job",
+        params={"api_key": api_key},
+        json={"optimizer_name": SOLVER_NAME, "data": {"data": {**INSTANCE, "edges": [[0, 9]]}}},
+    )
+    assert response.status_code == 422
+    assert client.spawned == []
+
+
+def test_unknown_job_is_404(client, api_key):
+    response = client.get("/job-result/0", params={"api_key": api_key})
+    assert response.status_code == 404
+
+
+def test_job_result_rehydrates_archived_payloads(client, api_key, db, finished_job):
+    job_id, input_data, result_data = finished_job
+    while archive.archive_batch(db) == archive.BATCH_SIZE:
+        pass
+
+    with db.cursor() as cursor:
+        cursor.execute("SELECT input_data, result_data, archived_at FROM Job WHERE job_id = %s", (job_id,))
+        row = cursor.fetchone()
+    assert row["archived_at"] is not None
+    assert row["result_data"] is None
+
+    response = client.get(f"/job-result/{job_id}", params={"api_key": api_key})
+    assert response.status_code == 200
+    job = response.json()
+    assert job["input_data"] == input_data
+    assert job["result_data"] == result_data
+
+
+def test_job_result_fails_when_archive_row_is_missing(client, api_key, db, finished_job):
+    job_id, _, _ = finished_job
+    with db.cursor() as cursor:
+        cursor.execute(
+            "UPDATE Job SET input_data = 'null', result_data = NULL, archived_at = NOW() WHERE job_id = %s",
+            (job_id,),
+        )
+
+    response = client.get(f"/job-result/{job_id}", params={"api_key": api_key})
+    assert response.status_code == 500
@@ -0,0 +1,25 @@
+import os
+from archive import compress_payload, decompress_payload
+from migrate import MIGRATIONS_DIR, read_statements
+
+
+def test_payload_round_trip():
+    payload = '{"data": {"group_sizes": [10, 20]}, "heatmap_data": [[0.0, 10.0]]}'
+    blob = compress_payload(payload)
+    assert isinstance(blob, bytes)
+    assert decompress_payload(blob) == payload
+
+
+def test_missing_payload_stays_none():
+    assert compress_payload(None) is None
+    assert decompress_payload(None) is None
+
+
+def test_migrations_only_contain_guarded_ddl():
+    # every migration must be safe to re-run after a partial apply
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        for statement in read_statements(os.path.join(MIGRATIONS_DIR, filename)):
+            first_line = statement.splitlines()[0].upper()
+            assert not first_line.startswith(("ALTER TABLE", "CREATE INDEX")), (filename, statement)
+            if first_line.startswith("CREATE TABLE"):
+                assert "IF NOT EXISTS" in first_line, (filename, statement)
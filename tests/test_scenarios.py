@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from optimizers.schemas import TafweejInstance, TafweejScenarioBatch, schema_for, scenario_arrays
+
+BASE = {
+    "group_sizes": [10, 20],
+    "start_segments": [0, 1],
+    "num_time": 4,
+    "edges": [[0, 1], [1, 2]],
+    "road_capacities": [30, 30, 50],
+}
+
+
+def test_scenario_arrays_applies_overrides_per_scenario():
+    base = TafweejInstance.load(BASE)
+    batch = scenario_arrays(base, [
+        {"name": "tight", "road_capacities": {"2": 25}},
+        {"group_sizes": {1: 5}},
+    ])
+    assert batch.names == ["tight", "scenario_2"]
+    assert batch.road_capacities.tolist() == [[30, 30, 25], [30, 30, 50]]
+    assert batch.group_sizes.tolist() == [[10, 20], [10, 5]]
+    # the base instance itself is left untouched
+    assert base.road_capacities.tolist() == [30, 30, 50]
+
+
+@pytest.mark.parametrize("scenarios", [
+    [],
+    [{"road_capacities": {"3": 10}}],
+    [{"group_sizes": {"0": 0}}],
+    [{"road_capacities": {"0": -1}}],
+    [{"road_capacities": {"0": 2 ** 70}}],
+])
+def test_scenario_arrays_rejects_invalid_overrides(scenarios):
+    with pytest.raises(ValueError):
+        scenario_arrays(TafweejInstance.load(BASE), scenarios)
+
+
+def test_scenario_batch_survives_json_storage():
+    batch = TafweejScenarioBatch.parse({"base": BASE, "scenarios": [{"road_capacities": {2: 40}}]})
+    # json.dumps turns the int keys into strings, load must still accept them
+    stored = {"base": BASE, "scenarios": [{"name": None, "group_sizes": {}, "road_capacities": {"2": 40}}]}
+    assert batch.model_dump()["scenarios"] == [{"name": None, "group_sizes": {}, "road_capacities": {2: 40}}]
+    assert TafweejScenarioBatch.load(stored).road_capacities.tolist() == [[30, 30, 40]]
+
+
+def test_schema_for_routes_only_typed_optimizers():
+    batch = {"base": BASE, "scenarios": [{}]}
+    assert schema_for("Tafweej_Scheduling_Optimizer", batch) is TafweejScenarioBatch
+    assert schema_for("Tafweej_Scheduling_Optimizer", BASE) is TafweejInstance
+    assert schema_for("SomeFreeFormOptimizer", batch) is None
+
+
+def test_scenario_result_builds_schedules_and_heatmap():
+    gurobipy = pytest.importorskip("gurobipy")
+    from optimizers.hajj_tafweej_scheduling_optimizer import _scenario_result
+
+    # group 1: segment 1 -> 2 -> 3 (final), group 2: segment 2 -> 3 (final) and stays
+    presence = np.zeros((2, 4, 3))
+    presence[0, 0, 0] = presence[0, 1, 1] = presence[0, 2, 2] = presence[0, 3, 2] = 1
+    presence[1, 1, 1] = presence[1, 2, 2] = presence[1, 3, 2] = 1
+
+    result = _scenario_result("base", gurobipy.GRB.OPTIMAL, presence, np.array([10, 20]), 4)
+    assert result["decision_variables"] == [
+        {"group": 1, "schedule": [{"tick": 1, "segment": 1}, {"tick": 2, "segment": 2}, {"tick": 3, "segment": 3}]},
+        {"group": 2, "schedule": [{"tick": 2, "segment": 2}, {"tick": 3, "segment": 3}]},
+    ]
+    assert result["visualization"]["heatmap_data"] == [
+        [10.0, 0.0, 0.0, 0.0],
+        [0.0, 30.0, 0.0, 0.0],
+        [0.0, 0.0, 30.0, 30.0],
+    ]
+    assert result["visualization"]["time_ticks"] == [1, 2, 3, 4]
+
+
+def test_scenario_result_without_solution():
+    gurobipy = pytest.importorskip("gurobipy")
+    from optimizers.hajj_tafweej_scheduling_optimizer import _scenario_result
+
+    result = _scenario_result("infeasible", gurobipy.GRB.INFEASIBLE, None, np.array([10, 20]), 4)
+    assert result["decision_variables"] == []
+    assert result["visualization"] == {"status": "No optimal solution found"}
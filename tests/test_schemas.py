@@ -0,0 +1,111 @@
+import io
+import numpy as np
+import pytest
+from pydantic import ValidationError
+from optimizers.schemas import TafweejInstance, dense_to_arrays
+
+# 2 groups, 3 segments in a chain, segment 3 is the (dummy) final segment
+DENSE = [
+    [10, 20],
+    [[1, 0, 0], [0, 1, 0]],
+    4,
+    [[0, 1, 0], [0, 0, 1], [0, 0, 0]],
+    [30, 30, 50],
+]
+SPARSE = {
+    "group_sizes": [10, 20],
+    "start_segments": [0, 1],
+    "num_time": 4,
+    "edges": [[0, 1], [1, 2]],
+    "road_capacities": [30, 30, 50],
+}
+
+
+def test_dense_to_arrays_extracts_start_indices_and_edges():
+    group_sizes, start_segments, num_time, edges, road_capacities = dense_to_arrays(DENSE)
+    assert group_sizes.tolist() == [10, 20]
+    assert start_segments.tolist() == [0, 1]
+    assert num_time == 4
+    assert edges.tolist() == [[0, 1], [1, 2]]
+    assert road_capacities.tolist() == [30, 30, 50]
+
+
+def test_dense_to_arrays_ignores_values_outside_int8():
+    dense = list(DENSE)
+    dense[3] = [[0, 1, 300], [0, 0, 1], [-200, 0, 0]]
+    assert dense_to_arrays(dense).edges.tolist() == [[0, 1], [1, 2]]
+
+
+def test_dense_to_arrays_requires_one_start_per_group():
+    dense = list(DENSE)
+    dense[1] = [[1, 1, 0], [0, 1, 0]]
+    with pytest.raises(ValueError):
+        dense_to_arrays(dense)
+
+
+def test_parse_stores_dense_input_in_sparse_form():
+    dumped = TafweejInstance.parse(DENSE).model_dump()
+    assert dumped == {**SPARSE, "edges": [(0, 1), (1, 2)]}
+
+
+@pytest.mark.parametrize("field, value", [
+    ("edges", [[0, 5]]),
+    ("start_segments", [0, 3]),
+    ("group_sizes", [10, 0]),
+    ("road_capacities", [30, 2 ** 70, 50]),
+])
+def test_parse_rejects_invalid_sparse_input(field, value):
+    with pytest.raises(ValidationError):
+        TafweejInstance.parse({**SPARSE, field: value})
+
+
+def test_from_npz_round_trip():
+    buffer = io.BytesIO()
+    np.savez(buffer, **{name: np.asarray(value) for name, value in SPARSE.items()})
+    instance = TafweejInstance.from_npz(buffer.getvalue())
+    assert instance.model_dump() == TafweejInstance.parse(SPARSE).model_dump()
+
+
+def test_from_npz_rejects_missing_fields_and_garbage():
+    buffer = io.BytesIO()
+    np.savez(buffer, group_sizes=np.array([1]))
+    with pytest.raises(ValueError):
+        TafweejInstance.from_npz(buffer.getvalue())
+    with pytest.raises(ValueError):
+        TafweejInstance.from_npz(b"not an npz archive")
+
+    buffer = io.BytesIO()
+    np.save(buffer, np.array([1, 2, 3]))
+    with pytest.raises(ValueError, match="npz"):
+        TafweejInstance.from_npz(buffer.getvalue())
+
+
+@pytest.mark.parametrize("field, value", [
+    ("group_sizes", [10.7, 20.2]),
+    ("start_segments", [0.9, 1.4]),
+    ("num_time", 4.8),
+    ("num_time", [4]),
+    ("road_capacities", [30, float("nan"), 50]),
+    ("edges", [["a", "b"]]),
+])
+def test_from_npz_rejects_non_integers_like_the_json_schema(field, value):
+    buffer = io.BytesIO()
+    np.savez(buffer, **{name: np.asarray(v) for name, v in {**SPARSE, field: value}.items()})
+    with pytest.raises(ValueError):
+        TafweejInstance.from_npz(buffer.getvalue())
+    with pytest.raises(ValueError):
+        TafweejInstance.parse({**SPARSE, field: value})
+
+
+def test_from_npz_accepts_integral_floats():
+    buffer = io.BytesIO()
+    np.savez(buffer, **{name: np.asarray(v, dtype=float) for name, v in SPARSE.items()})
+    assert TafweejInstance.from_npz(buffer.getvalue()).group_sizes == [10, 20]
+
+
+def test_from_msgpack_round_trip_and_rejects_fractions():
+    msgpack = pytest.importorskip("msgpack")
+    instance = TafweejInstance.from_msgpack(msgpack.packb(SPARSE))
+    assert instance.model_dump() == TafweejInstance.parse(SPARSE).model_dump()
+    with pytest.raises(ValueError):
+        TafweejInstance.from_msgpack(msgpack.packb({**SPARSE, "num_time": 4.8}))